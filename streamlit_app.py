@@ -1,29 +1,30 @@
+import base64
+import copy
+import csv
+import html
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-from uuid import uuid4
-import secrets as pysecrets
+import numpy as np
+from urllib.parse import quote
 from google.oauth2 import service_account
 from google.cloud import firestore
 
+try:  # optional: compiled start/end loop (pip install numba)
+    from numba import njit
+except ImportError:
+    njit = None
+
 # -------------------- Page & Mobile-first CSS --------------------
 st.set_page_config(page_title="Swim Meet Scheduler", layout="wide")
 
-st.markdown("""
-<style>
-/* Hide sidebar on small screens */
-@media (max-width: 768px) {
-  section[data-testid="stSidebar"] { display: none !important; }
-}
-/* Larger touch targets */
-.stButton>button { font-size: 18px !important; padding: 12px 20px !important; border-radius: 10px !important; }
-input, textarea, select { font-size: 18px !important; }
-[data-testid="stExpander"] p, [data-testid="stExpander"] div { font-size: 16px !important; }
-.card-header { display:flex; justify-content:space-between; align-items:center; }
-.card-title { font-weight:600; }
-.time-pill { background:#eef2ff; padding:4px 8px; border-radius:999px; font-size:14px; }
-</style>
-""", unsafe_allow_html=True)
+# Styles live in static/app.css (served via enableStaticServing in .streamlit/config.toml);
+# each rerun only sends this link tag, and the browser caches the stylesheet.
+st.markdown('<link rel="stylesheet" href="app/static/app.css">', unsafe_allow_html=True)
 
 # -------------------- Firestore Init (via Streamlit secrets) --------------------
 # Put your Firebase service account JSON content inside .streamlit/secrets.toml under [gcp_service_account]
@@ -39,61 +40,217 @@ meet_id = params.get("meet_id", None)
 viewer_token = params.get("token", None)
 
 # -------------------- Helpers --------------------
-TIME_FMT = "%I:%M %p"  # e.g. "10:00 AM"
-
-def parse_time_label(t: str) -> datetime:
-    try:
-        return datetime.strptime(t.strip(), TIME_FMT)
-    except Exception:
-        # fallback 10:00 AM
-        return datetime.strptime("10:00 AM", TIME_FMT)
+# Times are "%I:%M %p" labels, e.g. "10:00 AM". The pattern accepts exactly what
+# strptime("%I:%M %p") does: hour 1-12, minute 0-59 (one or two digits each),
+# whitespace, AM/PM in any case.
+_TIME_RE = re.compile(r"\s*(1[0-2]|0?[1-9]):([0-5]?\d)\s+([AP])M\s*", re.IGNORECASE)
+_DEFAULT_MINUTES = 10 * 60  # fallback 10:00 AM
+
+def parse_time_minutes(t: str) -> int:
+    """Minutes since midnight for a label like "9:30 AM"; never builds a datetime."""
+    m = _TIME_RE.fullmatch(t) if isinstance(t, str) else None
+    if m is None:
+        return _DEFAULT_MINUTES
+    return (int(m[1]) % 12 + (12 if m[3] in "Pp" else 0)) * 60 + int(m[2])
+
+# Every minute of the day formatted like strftime("%I:%M %p") ("09:30 AM"), built
+# with integer math (strftime goes through the locale machinery and is much
+# slower). Kept in a cache_resource so it is built once per process, not per rerun.
+@st.cache_resource
+def _clock_labels() -> tuple:
+    return tuple(
+        f"{(h24 + 11) % 12 + 1:02d}:{mm:02d} {'AM' if h24 < 12 else 'PM'}"
+        for h24 in range(24) for mm in range(60)
+    )
+
+def clock_labels(minutes: np.ndarray) -> list:
+    """Labels for times given as minutes since midnight (wraps past midnight)."""
+    # Truncate to the minute, as strftime does, after rounding to microseconds
+    idx = (np.rint(minutes * 60e6) // 60_000_000 % 1440).astype(np.intp)
+    return list(map(_clock_labels().__getitem__, idx.tolist()))
+
+# Whole-minute durations cover almost every item; 15.0 hashes like 15, so floats hit too
+_MINUTE_LABELS = {m: f"{m} min" for m in range(241)}
+_whole_minutes = "{} min".format
+_frac_minutes = "{:.2f} min".format
 
 def minutes_label(m: float) -> str:
     if m is None:
         return ""
-    if abs(m - int(m)) < 1e-9:
-        return f"{int(m)} min"
-    return f"{m:.2f} min"
-
-def item_duration_minutes(item: dict) -> float:
-    if item["type"] == "event":
-        heats = max(1, int(item.get("heats", 1) or 1))
-        heat_len = max(0.0, float(item.get("heat_length", 0) or 0))
-        return heats * heat_len
-    else:
-        return max(0.0, float(item.get("length", 0) or 0))
+    label = _MINUTE_LABELS.get(m)
+    if label is not None:
+        return label
+    whole = int(m)
+    return _whole_minutes(whole) if abs(m - whole) < 1e-9 else _frac_minutes(m)
+
+@dataclass(slots=True)
+class ScheduleItem:
+    """
+    One event or break, as built by the Add Event / Add Break buttons; its
+    field order defines ITEM_FIELDS. Firestore stores items as dicts (and the
+    editor edits those in place), so to_dict() is applied before an item is
+    stored. Fields an item doesn't use (heats on a break, length on an event)
+    stay None and are not written.
+    """
+    id: str
+    order: int
+    type: str
+    name: str
+    heats: int | None = None
+    heat_length: float | None = None
+    length: int | None = None
+    manual_start: str | None = None
+
+    def to_dict(self) -> dict:
+        return {f: v for f in ITEM_FIELDS if (v := getattr(self, f)) is not None}
+
+# Fields that define a schedule item; their values form the cache key for _calc.
+ITEM_FIELDS = tuple(f.name for f in fields(ScheduleItem))
+
+# Columns returned by calculate_schedule, one list per field, in schedule order.
+SCHEDULE_COLUMNS = ("ids", "orders", "types", "names", "heats", "heat_lengths", "lengths",
+                    "starts", "ends", "durations")
+
+# The app always writes "order" as an int, but hand-edited or very old items may
+# lack it (or hold a string); those sort as 0, as the original int(get("order", 0)) did.
+def by_order(item: dict) -> int:
+    return int(item.get("order") or 0)
+
+_ORDER_POS = ITEM_FIELDS.index("order")
 
-def calculate_schedule(schedule: list, day_start: str) -> list:
+def _key_by_order(row: tuple) -> int:
+    return int(row[_ORDER_POS] or 0)
+
+def schedule_key(schedule: list) -> tuple:
+    # map() over the bound dict.get runs the per-field lookups in C
+    item_fields = ITEM_FIELDS
+    return tuple([tuple(map(it.get, item_fields)) for it in schedule])
+
+EVENT, BREAK = 0, 1
+
+@dataclass
+class ScheduleSoA:
     """
-    Computes start/end for schedule. If an item has 'manual_start', it's used,
-    and all following items chain from it.
+    A day's items (sorted by order) as parallel NumPy columns for the minute
+    math. Fields an item's type doesn't use are zero (length on events, heats
+    and heat_lengths on breaks) and the rest are clamped (heats to at least 1,
+    missing heats counting as 1; lengths to at least 0, missing as 0), so every
+    duration is heats * heat_lengths + lengths. Any type other than "event"
+    is timed as a break.
+    anchors holds each item's manual start in minutes since midnight, NaN
+    where the clock runs on from the previous item; the first item is always
+    anchored (to its own manual_start or the day start).
     """
-    current = parse_time_label(day_start)
-    out = []
+    types: np.ndarray         # uint8, EVENT or BREAK
+    heats: np.ndarray         # int32
+    heat_lengths: np.ndarray  # float64
+    lengths: np.ndarray       # float64
+    anchors: np.ndarray       # float64
+
+    @classmethod
+    def from_columns(cls, types, heats, heat_lengths, lengths, manual_starts, day_start: str):
+        anchors = np.array([parse_time_minutes(m) if m else np.nan for m in manual_starts], dtype=np.float64)
+        if np.isnan(anchors[0]):
+            anchors[0] = parse_time_minutes(day_start)
+        types = np.array([EVENT if t == "event" else BREAK for t in types], dtype=np.uint8)
+        is_event = types == EVENT
+        heats = np.array([int(h or 1) for h in heats], dtype=np.int32)
+        heat_lengths = np.array([float(x or 0) for x in heat_lengths], dtype=np.float64)
+        lengths = np.array([float(x or 0) for x in lengths], dtype=np.float64)
+        return cls(
+            types=types,
+            heats=np.where(is_event, np.maximum(heats, 1), 0).astype(np.int32),
+            heat_lengths=np.where(is_event, np.maximum(heat_lengths, 0.0), 0.0),
+            lengths=np.where(is_event, 0.0, np.maximum(lengths, 0.0)),
+            anchors=anchors,
+        )
+
+    def durations(self) -> np.ndarray:
+        # No per-type select: the unused fields are already zero
+        return self.heats * self.heat_lengths + self.lengths
+
+def _compute_minutes_np(durs: np.ndarray, anchors: np.ndarray):
+    """(starts, ends) in minutes: durations accumulated from the latest anchor."""
+    anchored = ~np.isnan(anchors)
+    # Minutes elapsed before each item, then rebased onto its segment's anchor
+    elapsed = np.cumsum(durs) - durs
+    seg = np.maximum.accumulate(np.where(anchored, np.arange(len(durs)), 0))
+    starts = anchors[seg] + elapsed - elapsed[seg]
+    return starts, starts + durs
+
+def _compute_minutes_loop(durs: np.ndarray, anchors: np.ndarray):
+    """Same result as _compute_minutes_np, written as the plain loop numba compiles."""
+    starts = np.empty(durs.shape[0])
+    cur = 0.0
+    for i in range(durs.shape[0]):
+        if not np.isnan(anchors[i]):
+            cur = anchors[i]
+        starts[i] = cur
+        cur += durs[i]
+    return starts, starts + durs
+
+# The script re-executes on every rerun; building the numba dispatcher in a
+# cache_resource means it is compiled (or loaded from disk) once per process.
+@st.cache_resource
+def _compute_minutes_kernel():
+    return njit(cache=True)(_compute_minutes_loop) if njit is not None else _compute_minutes_np
+
+@st.cache_data(ttl=600, max_entries=256)
+def _calc(schedule_key: tuple, day_start: str) -> dict:
     # sort by order (stable)
-    schedule_sorted = sorted(schedule, key=lambda x: int(x.get("order", 0)))
-    for it in schedule_sorted:
-        item = dict(it)
-        dur_min = item_duration_minutes(item)
-        # Honor manual_start if provided
-        if item.get("manual_start"):
-            current = parse_time_label(item["manual_start"])
-        item_start = current
-        item_end = item_start + timedelta(minutes=dur_min)
-
-        item["start"] = item_start.strftime(TIME_FMT)
-        item["end"] = item_end.strftime(TIME_FMT)
-        item["duration"] = minutes_label(dur_min)
-
-        current = item_end
-        out.append(item)
-    return out
+    schedule_sorted = sorted(schedule_key, key=_key_by_order)
+    if not schedule_sorted:
+        return {col: [] for col in SCHEDULE_COLUMNS}
+    # Transpose the rows into field columns; no per-item dicts are built
+    ids, orders, types, names, heats, heat_lengths, lengths, manual_starts = map(list, zip(*schedule_sorted))
+    soa = ScheduleSoA.from_columns(types, heats, heat_lengths, lengths, manual_starts, day_start)
+    durs = soa.durations()
+    starts, ends = _compute_minutes_kernel()(durs, soa.anchors)
+    return {
+        "ids": ids, "orders": orders, "types": types, "names": names,
+        "heats": heats, "heat_lengths": heat_lengths, "lengths": lengths,
+        "starts": clock_labels(starts),
+        "ends": clock_labels(ends),
+        "durations": list(map(minutes_label, durs.tolist())),
+    }
+
+def calculate_schedule(schedule: list, day_start: str) -> dict:
+    """
+    Computes start/end for schedule. If an item has 'manual_start', it's used,
+    and all following items chain from it. Returns one list per field (see
+    SCHEDULE_COLUMNS) in schedule order; fields an item doesn't have are None.
+    Results are memoized on the item fields, so unchanged days are served from
+    cache on every refresh; an empty day returns before any key is built or hashed.
+    """
+    if not schedule:
+        return {col: [] for col in SCHEDULE_COLUMNS}
+    return _calc(schedule_key(schedule), day_start)
 
-def cascade_edit_start(schedule: list, index: int, new_start_str: str, day_start: str) -> list:
+def calculate_day(meet_id: str, day_name: str, day_data: dict) -> dict:
+    """
+    calculate_schedule() for a stored day, memoized in the session on the day
+    document's updated_at stamp (bumped by every write to the day) and start
+    time. A refresh of an unchanged day skips building the item key and the
+    st.cache_data hash/copy; each day keeps only its latest entry.
+    """
+    schedule = day_data.get("schedule", [])
+    start_time = day_data.get("start_time", "10:00 AM")
+    version = day_data.get("updated_at")
+    if version is None:  # never written through update_meet
+        return calculate_schedule(schedule, start_time)
+    memo = st.session_state.setdefault("_schedule_cache", {})
+    hit = memo.get((meet_id, day_name))
+    if hit and hit[0] == (version, start_time):
+        return hit[1]
+    computed = calculate_schedule(schedule, start_time)
+    memo[(meet_id, day_name)] = ((version, start_time), computed)
+    return computed
+
+def cascade_edit_start(schedule: list, index: int, new_start_str: str, day_start: str) -> dict:
     """
     Sets manual_start for the item at index, then recompute all following items.
     """
-    sched = sorted(schedule, key=lambda x: int(x.get("order", 0)))
+    sched = sorted(schedule, key=by_order)
     for i, item in enumerate(sched):
         if i == index:
             item["manual_start"] = new_start_str.strip()
@@ -101,34 +258,360 @@ def cascade_edit_start(schedule: list, index: int, new_start_str: str, day_start
     # Recompute to normalize start/end strings
     return calculate_schedule(sched, day_start)
 
+def resort_schedule(day_data: dict):
+    """
+    Keeps the stored schedule in order after an edit, so Firestore holds it in
+    display order and the sort in _calc runs over already-sorted input (which
+    Python's sort handles in a single linear pass).
+    """
+    day_data.get("schedule", []).sort(key=by_order)
+
+def ensure_ids(schedule: list) -> bool:
+    """
+    Gives items that have no id (hand-edited or very old data) a new one, in
+    place. Items that already have an id keep it, so ids stay stable across
+    reruns and only the missing ones are minted. Returns True if any were added.
+    """
+    minted = False
+    for item in schedule:
+        if not item.get("id"):
+            item["id"] = short_id()
+            minted = True
+    return minted
+
 def next_order(schedule: list) -> int:
     if not schedule:
         return 1
-    return max(int(x.get("order", 0)) for x in schedule) + 1
+    return max(map(by_order, schedule)) + 1
+
+# Ids and tokens are sliced from a shared pool of os.urandom bytes, so bursts of
+# adds cost one syscall per 256 bytes instead of one per id.
+@st.cache_resource
+def _random_pool() -> dict:
+    return {"buf": bytearray(), "lock": threading.Lock()}
+
+def random_bytes(n: int) -> bytes:
+    pool = _random_pool()
+    with pool["lock"]:
+        buf = pool["buf"]
+        if len(buf) < n:
+            buf += os.urandom(max(256, n))
+        out = bytes(buf[:n])
+        del buf[:n]  # never hand out the same bytes twice
+    return out
 
 def short_id(n=6) -> str:
-    return uuid4().hex[:n]
+    return random_bytes((n + 1) // 2).hex()[:n]
+
+def token_urlsafe(nbytes: int) -> str:
+    return base64.urlsafe_b64encode(random_bytes(nbytes)).rstrip(b"=").decode("ascii")
+
+CSV_HEADER = ("Meet", "Day", "Type", "Name", "Heats", "Heat Length", "Break Length",
+              "Start", "End", "Duration", "Order")
+
+def _opt(conv, value):
+    # Missing fields export as empty cells
+    return "" if value is None else conv(value)
+
+def iter_csv_rows(meet: dict):
+    """Yields one CSV row per item, day by day, straight from the computed columns."""
+    meet_name = meet.get("name", "")
+    for dname, ddata in meet.get("days", {}).items():
+        comp = calculate_schedule(ddata.get("schedule", []), ddata.get("start_time", "10:00 AM"))
+        for item_type, name, heats, heat_len, length, start, end, duration, order in zip(
+                comp["types"], comp["names"], comp["heats"], comp["heat_lengths"], comp["lengths"],
+                comp["starts"], comp["ends"], comp["durations"], comp["orders"]):
+            yield (meet_name, dname, item_type, name, _opt(int, heats), _opt(float, heat_len),
+                   _opt(int, length), start, end, duration, order)
+
+@st.cache_data(max_entries=32)
+def build_csv(meet_id: str, version: str, _meet: dict) -> bytes:
+    """
+    Full-meet CSV (all days), cached per (meet_id, version) so idle refreshes
+    reuse the bytes; _meet is excluded from the cache key. Rows stream from
+    iter_csv_rows() into the csv writer, so no row list is materialized.
+    Returns b"" when there is nothing to export.
+    """
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(CSV_HEADER)
+    header_end = buf.tell()
+    w.writerows(iter_csv_rows(_meet))
+    return buf.getvalue().encode("utf-8") if buf.tell() > header_end else b""
 
 # -------------------- Firestore Access --------------------
-def get_meet_doc(meet_id: str):
+# Layout: meets/{meet_id} holds name/owner_token/timestamps; each day lives in
+# its own document under meets/{meet_id}/days, so a write to one day never
+# re-sends (or contends with) the others.
+def day_doc_id(day: str) -> str:
+    """
+    Day names are free text ("2025/08/21", "Day 1.5"); quote them into a valid,
+    reversible document id. The readable name is also stored in the document.
+    """
+    return quote(day, safe=" ").replace(".", "%2E").replace("_", "%5F")
+
+def day_ref(meet_id: str, day: str):
+    return db.collection("meets").document(meet_id).collection("days").document(day_doc_id(day))
+
+# The script module is re-executed on every rerun, so the snapshot cache has to
+# live in a cache_resource to be shared across reruns and sessions.
+@st.cache_resource
+def _meet_cache() -> dict:
+    # meet_id -> {"data": dict | None, "update_time": Timestamp | None,
+    #             "days": {day_name: dict}, "day_names": tuple (sorted),
+    #             "day_times": {day_name: Timestamp}, "days_time": Timestamp | None}
+    return {}
+
+def _store_snapshot(meet_id: str, snap):
+    """
+    Keeps the newest snapshot seen for a meet. Deliveries that are not newer than
+    what we already hold (listener replays, reads racing a write) are ignored.
+    """
+    entry = _meet_cache().setdefault(meet_id, {})
+    update_time = snap.update_time if snap.exists else None
+    if "data" in entry and entry["update_time"] and update_time and update_time <= entry["update_time"]:
+        return
+    entry["data"] = snap.to_dict() if snap.exists else None
+    entry["update_time"] = update_time
+
+def _set_days(entry: dict, days: dict, times: dict):
+    entry["days"] = dict(sorted(days.items()))
+    entry["day_names"] = tuple(entry["days"])
+    entry["day_times"] = times
+    entry["days_time"] = max(times.values(), default=None)
+
+def _store_days(meet_id: str, snaps: list, read_time=None):
+    """
+    Merges a full read of the days sub-collection into the cache, newest-wins
+    per day document: a day we already hold at a later update_time (our own
+    write, stored before the listener caught up) is kept. Days missing from the
+    read are dropped, unless we hold them from after read_time.
+    """
+    entry = _meet_cache().setdefault(meet_id, {})
+    held_days = entry.get("days") or {}
+    held_times = entry.get("day_times") or {}
+    days, times = {}, {}
+    for snap in snaps:
+        data = snap.to_dict()
+        name = data.get("name", snap.id)
+        held = held_times.get(name)
+        if held and snap.update_time <= held:
+            days[name], times[name] = held_days[name], held
+        else:
+            days[name], times[name] = data, snap.update_time
+    if read_time:
+        for name, held in held_times.items():
+            if name not in days and held > read_time:
+                days[name], times[name] = held_days[name], held
+    _set_days(entry, days, times)
+
+def _store_written_days(meet_id: str, snaps):
+    """
+    Folds re-read day documents into the cached days (same per-day rule): one
+    copy and one sort for the whole set, however many days the write touched.
+    """
+    entry = _meet_cache().setdefault(meet_id, {})
+    days = dict(entry.get("days") or {})
+    times = dict(entry.get("day_times") or {})
+    for snap in snaps:
+        if not snap.exists:
+            continue
+        data = snap.to_dict()
+        name = data.get("name", snap.id)
+        held = times.get(name)
+        if held and snap.update_time <= held:
+            continue
+        days[name], times[name] = data, snap.update_time
+    _set_days(entry, days, times)
+
+def _read_meet(meet_id: str):
     ref = db.collection("meets").document(meet_id)
     snap = ref.get()
-    return ref, (snap.to_dict() if snap.exists else None)
+    _store_snapshot(meet_id, snap)
+    _store_days(meet_id, list(ref.collection("days").stream()) if snap.exists else [])
+
+# Meets watched at once per process; the least recently viewed is unwatched
+# (and its cached snapshot dropped, so it is read directly if viewed again).
+MAX_WATCHED_MEETS = 32
+
+@st.cache_resource
+def _listeners() -> dict:
+    # "watches": meet_id -> (meet watch, days watch), least recently viewed first
+    return {"watches": OrderedDict(), "lock": threading.Lock()}
+
+def _unwatch(meet_id: str, watches: tuple):
+    for watch in watches:
+        watch.unsubscribe()
+    _meet_cache().pop(meet_id, None)
+
+def drop_dead_listener(meet_id: str):
+    """
+    Firestore closes a watch after an error it can't recover from, without
+    telling the callbacks. If either of a meet's watches is no longer active,
+    forget both along with the cached snapshot, so the next read goes to
+    Firestore and get_listener() registers new ones.
+    """
+    reg = _listeners()
+    with reg["lock"]:
+        watches = reg["watches"].get(meet_id)
+        if watches is None or all(w.is_active for w in watches):
+            return
+        del reg["watches"][meet_id]
+    _unwatch(meet_id, watches)
+
+def get_listener(meet_id: str):
+    """
+    One pair of realtime listeners per meet per process (the meet document and
+    its days sub-collection); their callbacks keep the snapshot cache current
+    so reruns read from memory instead of Firestore. After the first delivery
+    only changed day documents cross the wire. Only registered by get_meet_doc
+    once the meet is known to exist, so arbitrary ids in the URL can't open
+    watch streams; at most MAX_WATCHED_MEETS meets are watched at once.
+    """
+    reg = _listeners()
+    with reg["lock"]:
+        watches = reg["watches"].get(meet_id)
+        if watches is not None:
+            reg["watches"].move_to_end(meet_id)
+            return watches
+        ref = db.collection("meets").document(meet_id)
+        def on_meet(doc_snapshot, changes, read_time):
+            for snap in doc_snapshot:
+                _store_snapshot(meet_id, snap)
+        def on_days(col_snapshot, changes, read_time):
+            _store_days(meet_id, col_snapshot, read_time)
+        watches = ref.on_snapshot(on_meet), ref.collection("days").on_snapshot(on_days)
+        reg["watches"][meet_id] = watches
+        evicted = []
+        while len(reg["watches"]) > MAX_WATCHED_MEETS:
+            evicted.append(reg["watches"].popitem(last=False))
+    for old_id, old_watches in evicted:
+        _unwatch(old_id, old_watches)
+    return watches
+
+def migrate_days(meet_id: str, legacy_days: dict):
+    """
+    Meets created before the days sub-collection keep their schedule in a
+    "days" map on the meet document; move it into day documents once.
+    """
+    batch = db.batch()
+    for name, day in legacy_days.items():
+        batch.set(day_ref(meet_id, name), {**day, "name": name}, merge=True)
+    batch.update(db.collection("meets").document(meet_id),
+                 {"days": firestore.DELETE_FIELD, "updated_at": firestore.SERVER_TIMESTAMP})
+    batch.commit()
+    _read_meet(meet_id)
+
+def meet_day_names(meet_id: str) -> tuple:
+    """Day names in display order, sorted once whenever the days are stored."""
+    return _meet_cache().get(meet_id, {}).get("day_names", ())
+
+def meet_version(meet_id: str) -> str:
+    """
+    Changes whenever the meet changes: the cached snapshots' update times (the
+    meet document's and the newest day document's, which arrive on separate
+    listeners). Every existing document has an update_time, so after
+    get_meet_doc() there is always one to use.
+    """
+    entry = _meet_cache().get(meet_id) or {}
+    update_time, days_time = entry.get("update_time"), entry.get("days_time")
+    return f"{update_time.isoformat() if update_time else ''}|{days_time.isoformat() if days_time else ''}"
+
+def get_meet_doc(meet_id: str):
+    """
+    Returns (ref, meet, version) with meet["days"] assembled from the day
+    documents, or (ref, None, "") if the meet doesn't exist. The version is
+    taken before the copy, so a write landing in between can only make the
+    meet newer than its version, never older: nothing cached on the version
+    (the export) misses a write it claims to include.
+    """
+    ref = db.collection("meets").document(meet_id)
+    drop_dead_listener(meet_id)
+    entry = _meet_cache().get(meet_id, {})
+    if "data" not in entry or "days" not in entry:
+        # Not watched (yet, or any more) or listeners haven't delivered: read once directly.
+        _read_meet(meet_id)
+        entry = _meet_cache()[meet_id]
+    if entry["data"] is None:
+        # Unknown ids (typos, stale links) get neither listeners nor a cache entry
+        _meet_cache().pop(meet_id, None)
+        return ref, None, ""
+    get_listener(meet_id)
+    if entry["data"].get("days"):
+        migrate_days(meet_id, entry["data"]["days"])
+        entry = _meet_cache()[meet_id]
+    version = meet_version(meet_id)
+    # Callers edit the returned dict in place, so never hand out the shared copy.
+    meet = copy.deepcopy(entry["data"])
+    meet["days"] = copy.deepcopy(entry["days"])
+    return ref, meet, version
 
 def create_meet_in_db(name: str):
     new_meet_id = short_id(8)
-    owner_token = pysecrets.token_urlsafe(8)
+    owner_token = token_urlsafe(8)
     ref = db.collection("meets").document(new_meet_id)
     ref.set({
         "name": name or "New Swim Meet",
         "owner_token": owner_token,
         "created_at": firestore.SERVER_TIMESTAMP,
-        "days": {}  # day_name -> { start_time: "10:00 AM", schedule: [] }
+        "updated_at": firestore.SERVER_TIMESTAMP,
+        # days live in the meets/{id}/days sub-collection: { name, start_time, schedule }
     })
     return new_meet_id, owner_token
 
-def update_meet(meet_id: str, meet_data: dict):
-    db.collection("meets").document(meet_id).set(meet_data, merge=True)
+def update_meet(meet_id: str, day_fields: dict):
+    """
+    Writes {day_name: {field: value}} into the day documents in one batch commit.
+    The batch also stamps updated_at on each day and on the meet, so changed
+    meets can be found with where("updated_at", ">", t).
+    """
+    ref = db.collection("meets").document(meet_id)
+    batch = db.batch()
+    for day, values in day_fields.items():
+        batch.set(day_ref(meet_id, day),
+                  {"name": day, **values, "updated_at": firestore.SERVER_TIMESTAMP}, merge=True)
+    batch.update(ref, {"updated_at": firestore.SERVER_TIMESTAMP})
+    batch.commit()
+    # Refresh the cache right away so the rerun that follows sees our own write.
+    _store_snapshot(meet_id, ref.get())
+    _store_written_days(meet_id, db.get_all([day_ref(meet_id, day) for day in day_fields]))
+
+def queue_update(day: str, **values):
+    """
+    Stages field writes to a day for this run. Repeated edits to the same field
+    collapse into one entry and flush_updates() sends them all in a single commit.
+    """
+    st.session_state.setdefault("dirty", {}).setdefault(day, {}).update(values)
+
+def flush_updates(meet_id: str) -> bool:
+    dirty = st.session_state.pop("dirty", None)
+    if not dirty:
+        return False
+    update_meet(meet_id, dirty)
+    return True
+
+# -------------------- Synced Inputs --------------------
+def synced_input(widget, label: str, value, key: str, **kwargs):
+    """
+    Draws a keyed input showing the stored value and returns the user's edit,
+    or None if the user didn't change it. Streamlit keeps a keyed widget's
+    state across reruns and ignores value= once it exists, so the widget is
+    driven through session_state: when the stored value moved (a cascade, a
+    timed refresh, another tab's write) and the user hasn't touched the input
+    since it was last drawn, the input is reset to it.
+    """
+    state = st.session_state
+    drawn = state.setdefault("_drawn", {})
+    edited = None
+    if key not in state:  # first draw, or Streamlit dropped the widget's state
+        state[key] = value
+    elif state[key] != drawn.get(key):
+        edited = state[key]
+    elif value != drawn.get(key):
+        state[key] = value
+    drawn[key] = value if edited is None else edited
+    widget(label, key=key, **kwargs)
+    return edited
 
 # -------------------- App Header --------------------
 st.title("🏊 Swim Meet Scheduler (Realtime – Firebase)")
@@ -152,68 +635,13 @@ with st.expander("➕ Create or Load a Meet", expanded=(meet_id is None)):
 # If no meet in URL, stop here
 if not meet_id:
     st.stop()
-
-# -------------------- Auto-refresh for live updates --------------------
-# Viewers auto-refresh every 5s; editors every 10s (can tweak)
-is_owner = False
-ref, meet = get_meet_doc(meet_id)
-if meet:
-    is_owner = (viewer_token is not None) and (viewer_token == meet.get("owner_token"))
-refresh_ms = 5000 if not is_owner else 10000
-st.autorefresh = st.experimental_rerun  # alias for clarity
-st_autorefresh = st.experimental_memo  # dummy to avoid linter
-st.experimental_set_query_params(meet_id=meet_id, token=viewer_token) if viewer_token else st.experimental_set_query_params(meet_id=meet_id)
-st.experimental_rerun  # no-op reference to keep tools happy
-st.experimental_memo.clear()  # no-op
-
-# Real autorefresh widget:
-st_autoref = st.experimental_data_editor if False else None  # placeholder
-st.experimental_set_query_params(**({ "meet_id": meet_id, **({"token": viewer_token} if viewer_token else {}) }))
-st_autorefresh_widget = st.experimental_rerun if False else None
-st_autorefresh_obj = st.empty()
-st_autorefresh_obj = st.autorefresh_obj if False else None
-st_autorefresh = st.experimental_rerun if False else None
-
-# Streamlit's built-in autorefresh
-st_autorefresh_token = st.experimental_data_editor if False else None
-st_autorefresh = st.experimental_rerun if False else None
-
-st.session_state.setdefault("tick", 0)
-if st.session_state.get("tick", 0) == 0:
-    st.session_state["tick"] = 1
-# Real one:
-st.experimental_set_query_params(**({ "meet_id": meet_id, **({"token": viewer_token} if viewer_token else {}) }))
-st_autorefresh_count = st.experimental_get_query_params  # no-op
-st_autorefresh_dummy = None
-st_autorefresh = st.experimental_rerun if False else None
-
-# Simpler: use st.experimental_rerun via st_autorefresh helper
-st_autorefresh_widget = st.experimental_data_editor if False else None
-st_autorefresh_placeholder = st.empty()
-st_autorefresh_placeholder.write("")  # no-op
-
-# Proper autorefresh:
-st_autorefresh = st.experimental_rerun if False else None
-st_autorefresh_count = st.session_state.get("autorefresh_count", 0)
-st.session_state["autorefresh_count"] = st_autorefresh_count + 1
-st.experimental_set_query_params(**({ "meet_id": meet_id, **({"token": viewer_token} if viewer_token else {}) }))
-st_autorefresh_container = st.empty()
-st_autorefresh_container.html(f"<div style='display:none'>{st_autorefresh_count}</div>", height=0)
-
-st_autorefresh_timer = st.empty()
-st_autorefresh_timer.write("")
-
-# Streamlit now offers st.rerun() timer via JS not officially; safest approach:
-st.markdown(f"""
-<script>
-  setTimeout(function() {{
-    window.parent.postMessage({{ isStreamlitMessage: true, type: "streamlit:rerun" }}, "*");
-  }}, {refresh_ms});
-</script>
-""", unsafe_allow_html=True)
+st.query_params.update({"meet_id": meet_id, **({"token": viewer_token} if viewer_token else {})})
 
 # -------------------- Load Meet From Firestore --------------------
-ref, meet = get_meet_doc(meet_id)
+# Loaded once per full run. Only the schedule fragment below refreshes on a
+# timer (viewers every 5s, editors every 10s) and re-reads the meet itself; when
+# it sees the meet changed since this run, it reruns the whole page.
+ref, meet, page_version = get_meet_doc(meet_id)
 if not meet:
     st.error("Meet not found. Check your URL.")
     st.stop()
@@ -223,18 +651,19 @@ st.subheader(f"Meet: **{meet.get('name','(no name)')}** {'(Editor)' if is_owner
 
 # -------------------- Day Management --------------------
 days = meet.get("days", {})
-day_names = list(days.keys())
 cols = st.columns([2, 1, 1])
-with cols[0]:
-    new_day = st.text_input("Add Day (e.g., Day 1 or 2025-08-21)", value="")
-with cols[1]:
-    if is_owner and st.button("Add Day"):
-        if new_day:
+if is_owner:
+    with cols[0]:
+        new_day = st.text_input("Add Day (e.g., Day 1 or 2025-08-21)", value="")
+    with cols[1]:
+        if st.button("Add Day") and new_day:
             days[new_day] = {"start_time": "10:00 AM", "schedule": []}
-            update_meet(meet_id, {"days": days})
+            queue_update(new_day, **days[new_day])
+            # Write now so the stored (and sorted) day names include it
+            flush_updates(meet_id)
             st.success(f"Day '{new_day}' added.")
-            st.experimental_rerun()
 with cols[2]:
+    day_names = meet_day_names(meet_id)
     active_day = st.selectbox("Active Day", options=day_names, index=0 if day_names else 0, placeholder="No days yet")
 
 if not day_names:
@@ -245,200 +674,223 @@ if not day_names:
 day_data = days.get(active_day, {"start_time": "10:00 AM", "schedule": []})
 st.markdown(f"### 🕒 Day Start Time — **{active_day}**")
 if is_owner:
-    new_start = st.text_input("Start Time (e.g. 9:30 AM)", value=day_data.get("start_time", "10:00 AM"), key=f"day-start-{active_day}")
-    if new_start != day_data.get("start_time"):
+    new_start = synced_input(st.text_input, "Start Time (e.g. 9:30 AM)", day_data.get("start_time", "10:00 AM"),
+                             key=f"day-start-{active_day}")
+    if new_start is not None and new_start != day_data.get("start_time"):
         day_data["start_time"] = new_start
         days[active_day] = day_data
-        update_meet(meet_id, {"days": days})
+        queue_update(active_day, start_time=new_start)
 else:
     st.write(f"**{day_data.get('start_time','10:00 AM')}**")
 
 # -------------------- Add Event / Break --------------------
-st.markdown("### ➕ Add Items")
-add_cols = st.columns(2)
-
-with add_cols[0]:
-    st.markdown("**Event**")
-    ev_name = st.text_input("Event Name", key="ev_name")
-    ev_heats = st.number_input("Heats", min_value=1, max_value=200, value=20, key="ev_heats")
-    ev_heat_len = st.number_input("Heat Length (minutes)", min_value=0.0, max_value=60.0, value=2.0, step=0.5, key="ev_heat_len")
-    if is_owner and st.button("Add Event"):
-        schedule = day_data.get("schedule", [])
-        schedule.append({
-            "id": short_id(),
-            "order": next_order(schedule),
-            "type": "event",
-            "name": ev_name or f"Event {len(schedule)+1}",
-            "heats": int(ev_heats),
-            "heat_length": float(ev_heat_len),
-            # optional 'manual_start'
-        })
-        day_data["schedule"] = schedule
-        days[active_day] = day_data
-        update_meet(meet_id, {"days": days})
-        st.success("Event added.")
-        st.experimental_rerun()
-
-with add_cols[1]:
-    st.markdown("**Break**")
-    br_name = st.text_input("Break Name", value="Break", key="br_name")
-    br_len = st.number_input("Break Length (minutes)", min_value=1, max_value=240, value=15, key="br_len")
-    if is_owner and st.button("Add Break"):
-        schedule = day_data.get("schedule", [])
-        schedule.append({
-            "id": short_id(),
-            "order": next_order(schedule),
-            "type": "break",
-            "name": br_name or "Break",
-            "length": int(br_len),
-        })
-        day_data["schedule"] = schedule
-        days[active_day] = day_data
-        update_meet(meet_id, {"days": days})
-        st.success("Break added.")
-        st.experimental_rerun()
+# Editor only: viewers never build the input widgets
+if is_owner:
+    st.markdown("### ➕ Add Items")
+    add_cols = st.columns(2)
+
+    with add_cols[0]:
+        st.markdown("**Event**")
+        ev_name = st.text_input("Event Name", key="ev_name")
+        ev_heats = st.number_input("Heats", min_value=1, max_value=200, value=20, key="ev_heats")
+        ev_heat_len = st.number_input("Heat Length (minutes)", min_value=0.0, max_value=60.0, value=2.0, step=0.5, key="ev_heat_len")
+        if st.button("Add Event"):
+            schedule = day_data.get("schedule", [])
+            schedule.append(ScheduleItem(
+                id=short_id(),
+                order=next_order(schedule),
+                type="event",
+                name=ev_name or f"Event {len(schedule)+1}",
+                heats=int(ev_heats),
+                heat_length=float(ev_heat_len),
+                # optional manual_start
+            ).to_dict())
+            day_data["schedule"] = schedule
+            days[active_day] = day_data
+            # Append just the new item rather than re-sending the whole list
+            queue_update(active_day, schedule=firestore.ArrayUnion([schedule[-1]]))
+            st.success("Event added.")
+
+    with add_cols[1]:
+        st.markdown("**Break**")
+        br_name = st.text_input("Break Name", value="Break", key="br_name")
+        br_len = st.number_input("Break Length (minutes)", min_value=1, max_value=240, value=15, key="br_len")
+        if st.button("Add Break"):
+            schedule = day_data.get("schedule", [])
+            schedule.append(ScheduleItem(
+                id=short_id(),
+                order=next_order(schedule),
+                type="break",
+                name=br_name or "Break",
+                length=int(br_len),
+            ).to_dict())
+            day_data["schedule"] = schedule
+            days[active_day] = day_data
+            # Append just the new item rather than re-sending the whole list
+            queue_update(active_day, schedule=firestore.ArrayUnion([schedule[-1]]))
+            st.success("Break added.")
 
 # -------------------- Mobile-first Schedule (cards with expand/collapse) --------------------
-st.markdown("### 📋 Schedule")
-schedule = day_data.get("schedule", [])
-computed = calculate_schedule(schedule, day_data.get("start_time", "10:00 AM"))
+# Fixed parts of the viewer table and the editor card layout, built once per run
+# rather than inside every fragment refresh.
+_TABLE_HEAD = ("<table class='sched'><thead><tr><th>Item</th><th>Start</th><th>End</th>"
+               "<th>Duration</th></tr></thead><tbody>")
+_TABLE_TAIL = "</tbody></table>"
+_TABLE_ROW = "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format
+_CARD_COLUMNS = (1, 2, 2, 1)
+
+def schedule_table_html(computed: dict) -> str:
+    """
+    Read-only schedule as one HTML table, so viewers get a single element per
+    refresh instead of a card (and several messages) per item.
+    """
+    escape, row = html.escape, _TABLE_ROW
+    body = "".join(
+        row(escape(name or ""), start, end, duration)
+        for name, start, end, duration in zip(computed["names"], computed["starts"], computed["ends"], computed["durations"])
+    )
+    return _TABLE_HEAD + body + _TABLE_TAIL
+
+def render_editor_card(idx: int, row: tuple, schedule: list, raw_by_id: dict, active_day: str):
+    """
+    Editable card. Inputs the user changed are applied to the underlying (not
+    computed) entry in raw_by_id; render_schedule decides whether anything
+    changed. Untouched inputs follow the stored values (see synced_input).
+    """
+    item_id, order, item_type, name, heats, heat_len, length, start, end, duration = row
+    with st.expander(f"**{name or ''}**  —  ⏱️ {start}", expanded=False):
+        c1, c2, c3, c4 = st.columns(_CARD_COLUMNS)
+
+        with c1:
+            # Order (editable)
+            new_order = synced_input(st.number_input, "Order", int(idx + 1 if order is None else order),
+                                     key=f"ord-{active_day}-{item_id}", min_value=1)
+        with c2:
+            st.write(f"**Type:** {item_type.capitalize()}")
+            # Name
+            new_name = synced_input(st.text_input, "Name", name or "", key=f"name-{active_day}-{item_id}")
+        with c3:
+            # Inline Start time editor (cascades)
+            new_start = synced_input(st.text_input, "Start time (edit to anchor & cascade)", start,
+                                     key=f"start-{active_day}-{item_id}")
+
+            st.write(f"**End:** {end}")
+            st.write(f"**Duration:** {duration}")
+
+        with c4:
+            # Delete button
+            if st.button("🗑️ Delete", key=f"del-{active_day}-{item_id}"):
+                # remove item by id (in place, so the signature check sees it)
+                raw_by_id.pop(item_id, None)
+                schedule[:] = [x for x in schedule if x.get("id") != item_id]
+
+        # Event-specific fields
+        if item_type == "event":
+            e1, e2 = st.columns(2)
+            with e1:
+                new_heats = synced_input(st.number_input, "Heats", int(heats or 1),
+                                         key=f"heats-{active_day}-{item_id}", min_value=1)
+            with e2:
+                new_heat_len = synced_input(st.number_input, "Heat Length (minutes)", float(heat_len or 0.0),
+                                            key=f"hlen-{active_day}-{item_id}", min_value=0.0, step=0.5)
+        else:  # break
+            new_length = synced_input(st.number_input, "Break Length (minutes)", int(length or 0),
+                                      key=f"blen-{active_day}-{item_id}", min_value=0)
+
+    # Save edits to the underlying schedule entry
+    raw = raw_by_id.get(item_id)
+    if raw is None:  # deleted above
+        return
+    if new_order is not None:
+        raw["order"] = int(new_order)
+    if new_name is not None:
+        raw["name"] = new_name
+    if item_type == "event":
+        if new_heats is not None:
+            raw["heats"] = int(new_heats)
+        if new_heat_len is not None:
+            raw["heat_length"] = float(new_heat_len)
+    elif new_length is not None:
+        raw["length"] = int(new_length)
+    # start anchor
+    if new_start and new_start != start:
+        raw["manual_start"] = new_start
+
+# Runs as a fragment: the timer (and widgets inside it) rerun only this block,
+# not the page header, day management and export sections. Timed runs redraw the
+# editor cards with whatever the inputs hold; synced_input keeps untouched
+# inputs on the stored values, so a tick never writes anything back.
+@st.fragment(run_every=5.0 if not is_owner else 10.0)
+def render_schedule(meet_id: str, active_day: str, is_owner: bool, page_version: str):
+    ref, meet, version = get_meet_doc(meet_id)
+    if not meet:
+        st.error("Meet not found. Check your URL.")
+        return
+    # The day list, start time and export are drawn outside this fragment; if
+    # the meet changed since the page was drawn, redraw all of it.
+    if version != page_version:
+        st.rerun()
+    days = meet.get("days", {})
+    day_data = days.get(active_day, {"start_time": "10:00 AM", "schedule": []})
+
+    st.markdown("### 📋 Schedule")
+    schedule = day_data.get("schedule", [])
+    # Editor cards and widget keys go by item id; persist any newly minted ids
+    # once so they are not re-minted on the next refresh.
+    if is_owner and ensure_ids(schedule):
+        queue_update(active_day, schedule=schedule)
+        computed = calculate_schedule(schedule, day_data.get("start_time", "10:00 AM"))
+    else:
+        computed = calculate_day(meet_id, active_day, day_data)
 
-if not computed:
-    st.caption("No items yet — add an Event or Break above.")
-else:
-    # Sort by order and render as cards
-    for idx, item in enumerate(sorted(computed, key=lambda x: int(x.get("order", 0)))):
-        header_left = f"{item.get('name','')}"
-        header_right = f"{item.get('start','')}"
-        with st.expander(
-            f"**{header_left}**  —  ⏱️ {header_right}",
-            expanded=False
-        ):
-            c1, c2, c3, c4 = st.columns([1, 2, 2, 1])
-
-            with c1:
-                # Order (editable)
-                new_order = st.number_input("Order", min_value=1, value=int(item.get("order", idx+1)),
-                                            key=f"ord-{active_day}-{item['id']}")
-            with c2:
-                st.write(f"**Type:** {item['type'].capitalize()}")
-                # Name
-                new_name = st.text_input("Name", value=item.get("name",""), key=f"name-{active_day}-{item['id']}")
-            with c3:
-                # Inline Start time editor (cascades)
-                new_start = st.text_input("Start time (edit to anchor & cascade)", value=item.get("start",""),
-                                          key=f"start-{active_day}-{item['id']}")
-
-                st.write(f"**End:** {item.get('end','')}")
-                st.write(f"**Duration:** {item.get('duration','')}")
-
-            with c4:
-                # Delete button
-                if is_owner and st.button("🗑️ Delete", key=f"del-{active_day}-{item['id']}"):
-                    # remove item by id
-                    filtered = [x for x in schedule if x.get("id") != item["id"]]
-                    day_data["schedule"] = filtered
-                    days[active_day] = day_data
-                    update_meet(meet_id, {"days": days})
-                    st.experimental_rerun()
-
-            # Event-specific fields
-            if item["type"] == "event":
-                e1, e2 = st.columns(2)
-                with e1:
-                    new_heats = st.number_input("Heats", min_value=1, value=int(item.get("heats", 1)),
-                                                key=f"heats-{active_day}-{item['id']}")
-                with e2:
-                    new_heat_len = st.number_input("Heat Length (minutes)", min_value=0.0, value=float(item.get("heat_length", 0.0)),
-                                                   step=0.5, key=f"hlen-{active_day}-{item['id']}")
-                # Save edits
-                if is_owner:
-                    changed = False
-                    # Update underlying schedule entry (not computed)
-                    for raw in schedule:
-                        if raw["id"] == item["id"]:
-                            # order/name
-                            if int(new_order) != int(raw.get("order", 0)):
-                                raw["order"] = int(new_order); changed = True
-                            if new_name != raw.get("name", ""):
-                                raw["name"] = new_name; changed = True
-                            # event fields
-                            if int(new_heats) != int(raw.get("heats", 1)):
-                                raw["heats"] = int(new_heats); changed = True
-                            if float(new_heat_len) != float(raw.get("heat_length", 0.0)):
-                                raw["heat_length"] = float(new_heat_len); changed = True
-                            # start anchor
-                            if new_start and new_start != item.get("start", ""):
-                                raw["manual_start"] = new_start; changed = True
-                    if changed:
-                        day_data["schedule"] = schedule
-                        days[active_day] = day_data
-                        update_meet(meet_id, {"days": days})
-                        st.experimental_rerun()
-
-            else:  # break
-                b1 = st.columns(1)[0]
-                with b1:
-                    new_length = st.number_input("Break Length (minutes)", min_value=0, value=int(item.get("length", 0)),
-                                                 key=f"blen-{active_day}-{item['id']}")
-                # Save edits
-                if is_owner:
-                    changed = False
-                    for raw in schedule:
-                        if raw["id"] == item["id"]:
-                            if int(new_order) != int(raw.get("order", 0)):
-                                raw["order"] = int(new_order); changed = True
-                            if new_name != raw.get("name", ""):
-                                raw["name"] = new_name; changed = True
-                            if int(new_length) != int(raw.get("length", 0)):
-                                raw["length"] = int(new_length); changed = True
-                            if new_start and new_start != item.get("start", ""):
-                                raw["manual_start"] = new_start; changed = True
-                    if changed:
-                        day_data["schedule"] = schedule
-                        days[active_day] = day_data
-                        update_meet(meet_id, {"days": days})
-                        st.experimental_rerun()
-
-    # Clear Day / Clear Meet (editor only)
-    act1, act2 = st.columns(2)
-    if is_owner and act1.button("🧹 Clear This Day"):
-        day_data["schedule"] = []
-        days[active_day] = day_data
-        update_meet(meet_id, {"days": days})
-        st.experimental_rerun()
-    if is_owner and act2.button("🧹 Clear ALL Days in Meet"):
-        for d in days:
-            days[d]["schedule"] = []
-        update_meet(meet_id, {"days": days})
-        st.experimental_rerun()
+    if not computed["ids"]:
+        st.caption("No items yet" + (" — add an Event or Break above." if is_owner else "."))
+    elif not is_owner:
+        st.markdown(schedule_table_html(computed), unsafe_allow_html=True)
+    else:
+        # Underlying (not computed) entries by id, so saving an edit is a dict lookup
+        raw_by_id = {x.get("id"): x for x in schedule}
+        # Widget values are applied to the entries below; the day is only written
+        # if the item fields actually differ from what was loaded.
+        sig_before = schedule_key(schedule)
+        # Render as cards; calculate_schedule already returns them in order
+        for idx, row in enumerate(zip(*(computed[col] for col in SCHEDULE_COLUMNS))):
+            render_editor_card(idx, row, schedule, raw_by_id, active_day)
+
+        # Clear Day / Clear Meet
+        act1, act2 = st.columns(2)
+        if act1.button("🧹 Clear This Day"):
+            schedule.clear()
+        resort_schedule(day_data)
+        # Compare item fields rather than trusting per-widget change checks
+        if schedule_key(schedule) != sig_before:
+            queue_update(active_day, schedule=schedule)
+        if act2.button("🧹 Clear ALL Days in Meet"):
+            for d in days:
+                days[d]["schedule"] = []
+                queue_update(d, schedule=[])
+
+    # One write for everything edited during this run, then redraw from it.
+    if flush_updates(meet_id):
+        st.rerun()
+
+# Commit the header edits (days, start time, added items) before the schedule
+# reads the meet. The schedule compares against page_version (what the header
+# shows), so after a header write it redraws the page once from the new state.
+flush_updates(meet_id)
+render_schedule(meet_id, active_day, is_owner, page_version)
 
 # -------------------- Global CSV Export (all days) --------------------
 st.markdown("---")
 st.subheader("⬇️ Export")
 
-global_rows = []
-days = meet.get("days", {})
-for dname, ddata in days.items():
-    comp = calculate_schedule(ddata.get("schedule", []), ddata.get("start_time", "10:00 AM"))
-    for it in comp:
-        global_rows.append({
-            "Meet": meet.get("name",""),
-            "Day": dname,
-            "Type": it.get("type",""),
-            "Name": it.get("name",""),
-            "Heats": it.get("heats",""),
-            "Heat Length": it.get("heat_length",""),
-            "Break Length": it.get("length",""),
-            "Start": it.get("start",""),
-            "End": it.get("end",""),
-            "Duration": it.get("duration",""),
-            "Order": it.get("order","")
-        })
-
-if global_rows:
-    csv_df = pd.DataFrame(global_rows)
-    csv_bytes = csv_df.to_csv(index=False).encode("utf-8")
+# The header may have written (and edited `meet` in place) since it was loaded;
+# re-read then, so the CSV is built from the same state as the version it is cached under.
+export_meet, export_version = meet, page_version
+if meet_version(meet_id) != page_version:
+    _, export_meet, export_version = get_meet_doc(meet_id)
+csv_bytes = build_csv(meet_id, export_version, export_meet) if export_meet else b""
+if csv_bytes:
     st.download_button("⬇️ Download Full Meet Schedule (CSV)", csv_bytes,
                        file_name=f"{meet.get('name','meet')}_schedule.csv",
                        mime="text/csv")